@@ -14,16 +14,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import os
 import logging
 import argparse
-import re
 import sys
 from confirmation_rule import ConfRule
-from common import LOG_LEVELS
-
-SLOT_DATA_FILE_FORMAT = re.compile(r"""\d+_\d+\.json""")
+from common import LOG_LEVELS, json_dumps, json_loads
 
 def get_logger(log_file, loglevel):
     """
@@ -56,39 +52,37 @@ def read_json(file_name):
     """
     read the json file and return the dictionary
     """
-    with open(file_name, 'r', encoding="UTF-8") as file:
-        return json.load(file)
+    with open(file_name, 'rb') as file:
+        return json_loads(file.read())
 
 def sort_file_names(data_folder):
     """
-    sort the files in a folder by slot and then by time_in_slot
+    sort the files in a folder by slot and then by time_in_slot, and yield their names in that order
     the file names is in the form of "{slot}_{time_in_slot}.json"
     """
-    file_names = os.listdir(data_folder)  # get all the file names in the folder
-    file_names = [item for item in file_names if SLOT_DATA_FILE_FORMAT.fullmatch(item) ]
-
-    # split the file names
+    # parse (slot, time_in_slot, file name) from all the slot data files in the folder
     file_name_arithmetic = []
-    for file_name in file_names:
-        split = file_name.split("_")
-        slot = int(split[0])
-        time_in_slot = int(split[1].split(".")[0])
-        file_name_arithmetic.append((slot, time_in_slot))
+    with os.scandir(data_folder) as entries:
+        for entry in entries:
+            file_name = entry.name
+            if not file_name.endswith(".json"):  # cheaply skip files that are not slot data
+                continue
+            slot, separator, time_in_slot = file_name[:-5].partition("_")
+            if separator and slot.isdecimal() and time_in_slot.isdecimal():
+                file_name_arithmetic.append((int(slot), int(time_in_slot), file_name))
 
     # sort the file names by slot and then by time_in_slot
-    file_name_arithmetic.sort(key=lambda x: (x[0], x[1]))
-    # reconstruct the file names
-    sorted_file_names = list(map(lambda x: f"{x[0]}_{x[1]}.json", file_name_arithmetic))
-    return sorted_file_names
+    file_name_arithmetic.sort()
+    yield from (file_name for _, _, file_name in file_name_arithmetic)
 
 def log_data_collection_time_period(num_of_processed_slots, logger):
     """
     Logs the data collection time period.
     """
     data_collection_time = 12 * num_of_processed_slots
-    data_collection_days = data_collection_time // (60*60*24)
-    data_collection_hours = data_collection_time % (60*60*24) // (60*60)
-    data_collection_mins = data_collection_time % (60*60) // 60
+    data_collection_days, data_collection_time = divmod(data_collection_time, 60*60*24)
+    data_collection_hours, data_collection_time = divmod(data_collection_time, 60*60)
+    data_collection_mins = data_collection_time // 60
     logger.info("""The total number of processed slots is: %s, the data collection period is: %s days %s hours %s minutes""",
         num_of_processed_slots,
         data_collection_days,
@@ -107,15 +101,22 @@ def execute_rule(rule, data_directory, logger):
 
     # First, ensure that the entires in the data_directory are sorted
     sorted_files = sort_file_names(data_directory)
+
+    # bind the lookups used on every iteration once
+    join = os.path.join
+    update_confirmed_head = rule.update_confirmed_head
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     for file_name in sorted_files:  # process the datasets
-        logger.debug(f"Processing {file_name}")
+        if debug_enabled:
+            logger.debug("Processing %s", file_name)
 
         # read conf info from file
-        conf_info = read_json(os.path.join(data_directory, file_name))
+        conf_info = read_json(join(data_directory, file_name))
 
         # update current confirmed with the next dataset
-        rule.update_confirmed_head(conf_info)
-    
+        update_confirmed_head(conf_info)
+
     return rule
 
 if __name__ == '__main__':
@@ -164,7 +165,10 @@ if __name__ == '__main__':
 
     # get the confirmation times
     conf_times = conf_rule.get_conf_times()
-    logger.info('The average confirmation time: %ss. Maximum confirmation time is: %ss.', sum(conf_times)/len(conf_times), max(conf_times))
+    if conf_times:
+        logger.info('The average confirmation time: %ss. Maximum confirmation time is: %ss.', sum(conf_times)/len(conf_times), max(conf_times))
+    else:
+        logger.warning('No confirmation time was recorded.')
     logger.info('The debug info is saved in %s', log_file)
 
     # save the info of the empty or forked slots
@@ -176,7 +180,7 @@ if __name__ == '__main__':
     logger.info('The info about the empty or forked slots is saved to %s', empty_or_forked_slots_file)
 
     # save conf times to file
-    with open(result_file, 'w', encoding="UTF-8") as f:
-        json.dump(conf_times, f)
+    with open(result_file, 'wb') as f:
+        f.write(json_dumps(conf_times))
 
     logger.info('The confirmation time data is saved to %s', result_file)
@@ -16,8 +16,9 @@
 
 """A simple helper for querying a Beacon node"""
 
-from urllib.parse import urljoin, urlparse
-import requests
+from urllib.parse import urlparse
+import urllib3
+from common import json_loads
 
 class BeaconClientError(Exception):
     """Base error class for Beacon Client Errors"""
@@ -40,6 +41,20 @@ class BeaconClient:
 
         self.api_endpoint = api_endpoint
         self.logger = logger
+
+        # Normalize the base URL once, so query URLs can be built by concatenation
+        self._base_url = api_endpoint.rstrip('/') + '/'
+
+        # Reuse pooled keep-alive connections to the Beacon node across queries.
+        # Transient errors are not retried here; the callers decide when to query again.
+        # Redirects are still followed, up to the same limit as requests (30).
+        # Compressed responses are requested, as requests did, and decoded by urllib3.
+        self._pool = urllib3.PoolManager(
+            maxsize=8,
+            timeout=5.0,
+            retries=urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=30),
+            headers={'accept': 'application/json', **urllib3.util.make_headers(accept_encoding=True)},
+        )
     
     def get_genesis(self):
         """
@@ -66,20 +81,32 @@ class BeaconClient:
         """
         return self._query_node('eth/v1/beacon/states/head/committees', params=params)
 
-    def _query_node(self, path, extra_headers={}, params={}):
+    def _query_node(self, path, extra_headers=None, params=None):
         """
         Queries the configured BeaconAPI at a given path, with optional headers and parameters.
         """
+        url = self._base_url + path.lstrip('/')
+
+        # The default headers are set on the pool; only pass headers when there are extra ones
+        kwargs = {'fields': params}
+        if extra_headers:
+            kwargs['headers'] = self._pool.headers | extra_headers
+
         try:
-            r = requests.get(urljoin(self.api_endpoint, path), headers={'accept': 'application/json',} | extra_headers, params=params, timeout=5)
-            r.raise_for_status()
-        except requests.exceptions.RequestException as e:
+            r = self._pool.request('GET', url, **kwargs)
+        except urllib3.exceptions.HTTPError as e:
             error_msg = f"An error occurred while querying the Beacon API: {str(e)}"
             self.logger.error(error_msg)
             raise ServerError(error_msg) from e
-        
+
+        if r.status >= 400:
+            error_msg = f"An error occurred while querying the Beacon API: {r.status} {r.reason} for url: {url}"
+            self.logger.error(error_msg)
+            raise ServerError(error_msg)
+
+        # Parse the raw body, to skip decoding the (potentially large) response to text first
         try:
-            return r.json()
+            return json_loads(r.data)
         except ValueError as e:
             error_msg = "Failed to decode the response from Beacon API"
             self.logger.error(error_msg)
@@ -18,17 +18,24 @@ A script to periodically query a Beacon node for fork-choice data
 and persist it for further analysis
 """
 
-import json
 import time
 import argparse
+import atexit
 import configparser
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 import eth2spec.capella.mainnet as spec
-from common import LOG_LEVELS
+from common import LOG_LEVELS, json_dumps
 from beacon_client import BeaconClient, BeaconClientError
 
 logger = logging.getLogger('ConfRuleCollectData')
 
+SECONDS_PER_SLOT = int(spec.config.SECONDS_PER_SLOT)
+
+# Threads for the concurrent Beacon queries of each poll, started once and reused across polls
+query_executor = ThreadPoolExecutor(max_workers=3)
+atexit.register(query_executor.shutdown)
+
 # Much of this code is forked and adapted from the prototype of the paper: A Confirmation Rule for the Ethereum Consensus Protocol
 # Original code is available at: https://gist.github.com/adiasg/4150de36181fd0f4b2351bef7b138893?ref=adiasg.me
 
@@ -51,10 +58,7 @@ def calculate_current_slot(genesis_time_seconds):
     data snapshot.
     :returns a tuple containing the current slot (int) and current time in the slot (int)
     """
-    current_time = time.time()
-    current_slot = int(current_time - genesis_time_seconds) // spec.config.SECONDS_PER_SLOT
-    current_time_in_slot = int(current_time - genesis_time_seconds) % spec.config.SECONDS_PER_SLOT
-    return int(current_slot), int(current_time_in_slot)
+    return divmod(int(time.time() - genesis_time_seconds), SECONDS_PER_SLOT)
 
 
 def get_confirmation_context(beacon_client, current_slot):
@@ -70,27 +74,27 @@ def get_confirmation_context(beacon_client, current_slot):
     :raises NodeError: Raised if there was an issue querying the Beacon node
     :raises ForkChoiceDataNotUpdatedError: Raised if the data to need to be re-queried 
     """
+    # The three queries are independent, so issue them concurrently over the client's connection pool
+    head_block_header_future = query_executor.submit(beacon_client.get_block_headers)
+    fork_choice_context_future = query_executor.submit(beacon_client.get_fork_choice)
+    head_committee_future = query_executor.submit(beacon_client.get_committees, params={'slot': current_slot})
+    wait((head_block_header_future, fork_choice_context_future, head_committee_future))  # leave no query running on errors
     try:
-        head_block_header = beacon_client.get_block_headers()
-        fork_choice_context = beacon_client.get_fork_choice()
-        head_committee = beacon_client.get_committees(params={'slot': current_slot})
+        head_block_header = head_block_header_future.result()
+        fork_choice_context = fork_choice_context_future.result()
+        head_committee = head_committee_future.result()
     except BeaconClientError as e:
         raise NodeError() from e
 
     # If the head_committee is missing data, retry
     # This can occur if querying at the beginning of an epoch
-    committee_size = 0
     try:
-        for comm in head_committee['data']:
-            committee_size += len(comm['validators'])
+        committee_size = sum(len(comm['validators']) for comm in head_committee['data'])
     except Exception as e:
         raise ForkChoiceDataNotUpdatedError() from e
 
     # Prepare a dict of fork choice blocks, keyed by their root
-    nodes = {}
-    for node in fork_choice_context['fork_choice_nodes']:
-        block_root = node['block_root']
-        nodes[block_root] = node
+    nodes = {node['block_root']: node for node in fork_choice_context['fork_choice_nodes']}
 
     return {
         'current_slot': current_slot,
@@ -108,10 +112,9 @@ def store_data(data_directory, data, current_slot, current_time_in_slot):
 
     Each file is formatted as: <slot>_<current seconds in slot>.json.
     """
-    json_string = json.dumps(data)
     file_name = f'{data_directory}/{current_slot}_{current_time_in_slot}.json'
-    with open(file_name, 'a', encoding='UTF-8') as f:
-        f.write(json_string)
+    with open(file_name, 'wb') as f:
+        f.write(json_dumps(data))
     logger.debug('Saved fork choice data to: %s', file_name)
 
 
@@ -188,21 +191,28 @@ if __name__ == '__main__':
     genesis_time = client.get_genesis()
 
     # Run query
-    query_start_time = interval_start_time = time.monotonic()
-    while interval_start_time < query_start_time + args.period:
+    # Polls are scheduled at fixed offsets (multiples of the frequency) from the start time,
+    # so the time spent querying and sleeping does not accumulate as drift.
+    query_start_time = time.monotonic()
+    while time.monotonic() < query_start_time + args.period:
         try:
             run(
                 client,
                 args.datadir,
                 genesis_time
             )
-            cur_time = time.monotonic()
-            time.sleep(max(args.frequency - (cur_time - interval_start_time), 0))
 
         except NodeError:
             time.sleep(args.waittime)
+            continue
 
         except ForkChoiceDataNotUpdatedError:
             time.sleep(args.adjusttime)
-
-        interval_start_time = time.monotonic()
+            continue
+
+        # Sleep until the next scheduled poll, skipping any polls missed while querying
+        # (a frequency of 0 polls back to back)
+        if args.frequency > 0:
+            elapsed_time = time.monotonic() - query_start_time
+            next_poll_time = (elapsed_time // args.frequency + 1) * args.frequency
+            time.sleep(max(next_poll_time - elapsed_time, 0))
@@ -14,5 +14,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library if orjson is not installed
+    orjson = None
+
 LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
 
+def json_loads(data):
+    """
+    Deserializes JSON from ``data`` (bytes), using orjson when it is available.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """
+    Serializes ``obj`` to compact JSON bytes, using orjson when it is available.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('UTF-8')